@@ -0,0 +1,44 @@
+# convert_to_parquet.py
+import pandas as pd
+
+# --- Configuration ---
+SALES_CSV_PATH = "data/innovategear_sales_data.csv"
+SALES_PARQUET_PATH = "data/innovategear_sales_data.parquet"
+
+# Low-cardinality columns stored as dictionary<string> so they load back as pandas categoricals
+SALES_DICTIONARY_COLUMNS = ['Category', 'MarketingSource', 'State', 'CustomerName', 'Product']
+SALES_NUMERIC_DTYPES = {'Price': 'float32', 'Quantity': 'int16', 'SatisfactionScore': 'int8'}
+
+CUSTOMER_CSV_PATH = "data/customer_intelligence_data.csv"
+CUSTOMER_PARQUET_PATH = "data/customer_intelligence_data.parquet"
+
+# One float column per month of sentiment history, oldest first
+SENTIMENT_COLUMNS = [f"Sent_{i}" for i in range(12)]
+
+
+# --- Conversion Logic ---
+def write_sales_parquet(df, file_path):
+    """Write the sales data to Parquet with a typed OrderDate, precomputed TotalRevenue and dictionary-encoded filter columns."""
+    data = df.astype(SALES_NUMERIC_DTYPES)
+    data['OrderDate'] = pd.to_datetime(data['OrderDate'])
+    data['TotalRevenue'] = data['Quantity'].astype('float32') * data['Price']
+    for col in SALES_DICTIONARY_COLUMNS:
+        data[col] = data[col].astype('category')
+    data.to_parquet(file_path, engine="pyarrow", compression="zstd", index=False)
+    return data
+
+
+def write_customer_parquet(df, file_path):
+    """Write the customer data to Parquet with a typed LastPurchaseDate, a dictionary-encoded ChurnRisk and float32 sentiment columns."""
+    data = df.astype({col: 'float32' for col in SENTIMENT_COLUMNS})
+    data['LastPurchaseDate'] = pd.to_datetime(data['LastPurchaseDate'])
+    data['ChurnRisk'] = data['ChurnRisk'].astype('category')
+    data.to_parquet(file_path, engine="pyarrow", compression="zstd", index=False)
+    return data
+
+
+if __name__ == "__main__":
+    df = write_sales_parquet(pd.read_csv(SALES_CSV_PATH), SALES_PARQUET_PATH)
+    print(f"✅ Success! Data file '{SALES_PARQUET_PATH}' created with {len(df)} records.")
+    df = write_customer_parquet(pd.read_csv(CUSTOMER_CSV_PATH), CUSTOMER_PARQUET_PATH)
+    print(f"✅ Success! Data file '{CUSTOMER_PARQUET_PATH}' created with {len(df)} records.")
@@ -0,0 +1,2 @@
+# core/__init__.py
+# Shared helpers imported by the dashboard pages.
@@ -0,0 +1,55 @@
+# core/common.py
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+
+# --- CUSTOM CSS ---
+@st.cache_resource
+def read_css(file_name):
+    """Read a CSS file once per process; every page and rerun shares the same string without a cache copy."""
+    with open(file_name) as f:
+        return f.read()
+
+def load_css(file_name):
+    """A function to load a CSS file from the root directory."""
+    st.markdown(f"<style>{read_css(file_name)}</style>", unsafe_allow_html=True)
+
+
+# --- CHART HELPERS ---
+@st.cache_resource
+def transparent_dark():
+    """The plotly_dark template with transparent paper and plot backgrounds, resolved once and shared by every chart."""
+    template = go.layout.Template(pio.templates['plotly_dark'])
+    template.layout.paper_bgcolor = 'rgba(0,0,0,0)'
+    template.layout.plot_bgcolor = 'rgba(0,0,0,0)'
+    return template
+
+# Upper bound on points sent to the browser for a single time-series trace
+MAX_CHART_POINTS = 2000
+
+def downsample_lttb(series, max_points=MAX_CHART_POINTS):
+    """Reduce a datetime-indexed series to at most max_points using Largest-Triangle-Three-Buckets."""
+    n = len(series)
+    if n <= max_points or max_points < 3:
+        return series
+    x = np.asarray(series.index, dtype='datetime64[ns]').astype('int64').astype(float)
+    y = series.to_numpy(dtype=float)
+
+    # First and last points are always kept; the rest are split into equal buckets
+    every = (n - 2) / (max_points - 2)
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        next_hi = min(int((i + 2) * every) + 1, n)
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return series.iloc[keep]
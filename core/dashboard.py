@@ -0,0 +1,344 @@
+# core/dashboard.py
+
+import os
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from core.common import downsample_lttb, transparent_dark
+
+# --- CONFIGURATION ---
+DATA_PATH = "data/innovategear_sales_data.csv"
+
+# Filter and grouping columns kept as categoricals so isin/groupby work on integer codes
+CATEGORY_COLUMNS = ('Category', 'MarketingSource', 'State', 'CustomerName')
+# Columns the filters, KPIs and charts work on; the rest are only shown in the raw data grid
+CORE_COLUMNS = ['OrderDate', 'CustomerName', 'State', 'Category', 'Quantity', 'Price', 'MarketingSource', 'SatisfactionScore']
+DETAIL_COLUMNS = ['OrderID', 'Product']
+GRID_COLUMNS = ['OrderID', 'OrderDate', 'CustomerName', 'State', 'Product', 'Category', 'Quantity', 'Price', 'MarketingSource', 'SatisfactionScore', 'TotalRevenue']
+# Narrow numeric types halve the bytes scanned by the filters and aggregations
+NUMERIC_DTYPES = {'Price': 'float32', 'Quantity': 'int16', 'SatisfactionScore': 'int8'}
+
+MAX_GRID_ROWS = 1000
+
+chart_template = transparent_dark()
+# Plotly config shared by every chart: interactive, and resized with its container
+chart_config = {"staticPlot": False, "responsive": True}
+
+
+# --- DATA LOADING AND PREPARATION ---
+def resolve_data_path(file_path):
+    """Return the Parquet copy written by 'convert_to_parquet.py' when it exists, otherwise the CSV itself."""
+    parquet_path = os.path.splitext(file_path)[0] + ".parquet"
+    return parquet_path if os.path.exists(parquet_path) else file_path
+
+@st.cache_resource
+def load_table(file_path, mtime):
+    """Read a sales file into an Arrow table shared by every session; a new mtime forces a re-read."""
+    # Memory-mapped reads let the OS page cache back the file buffers instead of copying them in
+    if file_path.endswith(".parquet"):
+        return pq.read_table(file_path, memory_map=True)
+    column_types = {'OrderDate': pa.timestamp('ns')}
+    column_types.update({col: pa.type_for_alias(dtype) for col, dtype in NUMERIC_DTYPES.items()})
+    with pa.memory_map(file_path) as source:
+        return pa_csv.read_csv(source, convert_options=pa_csv.ConvertOptions(column_types=column_types))
+
+# The frames below are cached as shared resources, so every rerun and session gets the same object without a copy.
+# Nothing downstream may modify them in place; filters only slice, take or aggregate into new objects.
+@st.cache_resource
+def load_data(file_path, mtime):
+    """Convert the cached Arrow table into the sorted, categorical sales frame used by the dashboard."""
+    table = load_table(file_path, mtime)
+    columns = CORE_COLUMNS + (['TotalRevenue'] if 'TotalRevenue' in table.column_names else [])
+    data = table.select(columns).to_pandas()
+    if 'TotalRevenue' not in data:
+        # Only the CSV fallback needs this; the Parquet file stores TotalRevenue precomputed
+        data['TotalRevenue'] = data['Quantity'].astype('float32') * data['Price']
+    for col in CATEGORY_COLUMNS:
+        data[col] = data[col].astype('category')
+    # Sorted dates let the filters slice the date range with a binary search
+    data = data.sort_values('OrderDate', kind='stable').reset_index(drop=True)
+    # Months since the first order month, so monthly revenue is a bincount instead of a resample
+    months = data['OrderDate'].to_numpy().astype('datetime64[M]')
+    data['MonthCode'] = (months - months[0]).astype('int16')
+
+    # Sidebar options, date bounds and the file version, computed once here instead of on every rerun;
+    # the frame is sorted, so the date bounds are its first and last dated rows rather than full-column scans.
+    # The sort puts missing dates last, so the latest date sits just before them.
+    dates = data['OrderDate']
+    last_dated = int(dates.count()) - 1
+    meta = {
+        "file_path": file_path,
+        "mtime": mtime,
+        "categories": data['Category'].cat.categories.tolist(),
+        "sources": data['MarketingSource'].cat.categories.tolist(),
+        # Columns with missing values can't take the "every level selected" shortcut: those rows must still be dropped
+        "has_missing": {col: bool(data[col].isna().any()) for col in ('Category', 'MarketingSource')},
+        "min_date": dates.iat[0].date(),
+        "max_date": dates.iat[last_dated].date(),
+        "first_month": months[0],
+    }
+    return data, meta
+
+@st.cache_resource
+def load_detail(file_path, mtime):
+    """Load the display-only columns in the same OrderDate order as load_data, for the raw data grid."""
+    data = load_table(file_path, mtime).select(['OrderDate'] + DETAIL_COLUMNS).to_pandas()
+    data['Product'] = data['Product'].astype('category')
+    return data.sort_values('OrderDate', kind='stable').reset_index(drop=True)[DETAIL_COLUMNS]
+
+def get_data(file_path=DATA_PATH):
+    """Return the cached sales frame and its metadata, preferring the Parquet copy of file_path."""
+    data_path = resolve_data_path(file_path)
+    return load_data(data_path, os.path.getmtime(data_path))
+
+
+# --- FILTERING AND AGGREGATION ---
+def category_mask(column, selected):
+    """Boolean row mask for a categorical column, built from a per-level lookup table indexed by the codes."""
+    positions = column.cat.categories.get_indexer(list(selected))
+    # One spare slot at the end stays False: missing values have code -1, which indexes it, so they never match
+    lookup = np.zeros(len(column.cat.categories) + 1, dtype=bool)
+    lookup[positions[positions >= 0]] = True
+    return lookup[column.cat.codes.to_numpy()]
+
+def sum_by_category(column, weights):
+    """Sum weights per observed level of a categorical column with one bincount over its codes."""
+    codes = column.cat.codes.to_numpy()
+    # Missing values carry code -1; drop them like groupby does before counting
+    present = codes >= 0
+    codes, weights = codes[present], weights[present]
+    size = len(column.cat.categories)
+    sums = np.bincount(codes, weights=weights, minlength=size)
+    observed = np.bincount(codes, minlength=size) > 0
+    index = pd.Index(column.cat.categories[observed], name=column.name)
+    return pd.Series(sums[observed], index=index, name=weights.name)
+
+def count_distinct(column):
+    """Exact number of distinct values in a categorical column, counted from its codes without hashing strings."""
+    codes = column.cat.codes.to_numpy()
+    return int(np.count_nonzero(np.bincount(codes[codes >= 0], minlength=len(column.cat.categories))))
+
+def monthly_totals(month_codes, weights, first_month):
+    """Sum weights per calendar month with one bincount over MonthCode, labelled by month end like resample('M')."""
+    if len(month_codes) == 0:
+        return pd.Series(dtype='float64', index=pd.DatetimeIndex([], name='OrderDate'), name=weights.name)
+    codes = month_codes.to_numpy()
+    lo, hi = codes.min(), codes.max()
+    # Months without sales between the first and last selected month still get a zero entry
+    sums = np.bincount(codes - lo, weights=weights.to_numpy(), minlength=hi - lo + 1)
+    months = first_month + np.arange(lo, hi + 1)
+    month_ends = (months + 1).astype('datetime64[D]') - 1
+    return pd.Series(sums, index=pd.DatetimeIndex(month_ends, name='OrderDate'), name=weights.name)
+
+@st.cache_data
+def compute_filtered(file_path, mtime, start_date, end_date, categories, sources):
+    """Filter the sales data and compute the KPIs and chart aggregations for one filter state."""
+    data, meta = load_data(file_path, mtime)
+
+    # OrderDate is sorted, so the date range is a contiguous slice found by binary search
+    dates = data['OrderDate'].to_numpy()
+    lo = dates.searchsorted(np.datetime64(start_date), side='left')
+    hi = dates.searchsorted(np.datetime64(end_date), side='right')
+    window = data.iloc[lo:hi]
+
+    # The default state selects every level, in which case the date slice is already the answer and no mask is built
+    all_categories = len(categories) == len(data['Category'].cat.categories) and not meta["has_missing"]['Category']
+    all_sources = len(sources) == len(data['MarketingSource'].cat.categories) and not meta["has_missing"]['MarketingSource']
+    if all_categories and all_sources:
+        filtered = window
+    else:
+        # One combined mask over the window, reused for every aggregation below
+        mask = np.ones(len(window), dtype=bool)
+        if not all_categories:
+            mask &= category_mask(window['Category'], categories)
+        if not all_sources:
+            mask &= category_mask(window['MarketingSource'], sources)
+        # take() on the row positions allocates fresh column arrays; keep the numeric ones C-contiguous for the reductions
+        filtered = window.take(np.flatnonzero(mask))
+        for col in ('TotalRevenue', 'Quantity', 'SatisfactionScore'):
+            values = filtered[col].to_numpy()
+            if not values.flags.c_contiguous:
+                filtered[col] = np.ascontiguousarray(values)
+
+    # KPIs reduce the column arrays directly, accumulating the narrow dtypes in float64/int64
+    revenue = filtered['TotalRevenue'].to_numpy()
+    quantity = filtered['Quantity'].to_numpy()
+    satisfaction = filtered['SatisfactionScore'].to_numpy()
+    kpis = (
+        float(revenue.sum(dtype='float64')),
+        int(quantity.sum(dtype='int64')),
+        float(satisfaction.mean(dtype='float64')) if len(satisfaction) else np.nan,
+        count_distinct(filtered['CustomerName']),
+    )
+
+    return {
+        "kpis": kpis,
+        "by_time": monthly_totals(filtered['MonthCode'], filtered['TotalRevenue'], meta["first_month"]),
+        "by_cat": sum_by_category(filtered['Category'], filtered['TotalRevenue']).sort_values(ascending=True),
+        "by_state": sum_by_category(filtered['State'], filtered['TotalRevenue']).reset_index(),
+        "raw": filtered,
+    }
+
+
+# --- SIDEBAR FILTERS ---
+def get_filters(meta):
+    """Draw the sidebar filter widgets and return the cache key for the selected filter state."""
+    # Date Range Selector
+    min_date = meta["min_date"]
+    max_date = meta["max_date"]
+    start_date, end_date = st.sidebar.date_input(
+        "Select Date Range",
+        [min_date, max_date],
+        min_value=min_date,
+        max_value=max_date
+    )
+
+    # Category Multi-select
+    all_categories = meta["categories"]
+    selected_categories = st.sidebar.multiselect(
+        "Select Product Categories",
+        options=all_categories,
+        default=all_categories
+    )
+
+    # Marketing Source Multi-select
+    all_sources = meta["sources"]
+    selected_sources = st.sidebar.multiselect(
+        "Select Marketing Source",
+        options=all_sources,
+        default=all_sources
+    )
+
+    # Sorted tuples make the cache key independent of the order options were (re)selected in
+    return (
+        meta["file_path"], meta["mtime"], start_date, end_date,
+        tuple(sorted(selected_categories)), tuple(sorted(selected_sources)),
+    )
+
+
+# --- KPI METRICS ---
+def render_kpis(kpis):
+    """Display the four headline KPIs in columns."""
+    total_revenue, total_sales, avg_satisfaction, unique_customers = kpis
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(label="Total Revenue", value=f"${total_revenue:,.2f}")
+    with col2:
+        st.metric(label="Total Items Sold", value=f"{total_sales:,}")
+    with col3:
+        st.metric(label="Avg. Satisfaction Score", value=f"{avg_satisfaction:.2f} / 5")
+    with col4:
+        st.metric(label="Unique Customers", value=f"{unique_customers}")
+
+
+# --- CHARTS ---
+@st.cache_data
+def build_time_chart_json(file_path, mtime, start_date, end_date, categories, sources):
+    """Build the Revenue Over Time figure for one filter state and return it already encoded as JSON."""
+    results = compute_filtered(file_path, mtime, start_date, end_date, categories, sources)
+    revenue_over_time = downsample_lttb(results["by_time"])
+    # px.area has no WebGL mode, so draw a filled WebGL line instead
+    fig_time = px.line(
+        revenue_over_time,
+        x=revenue_over_time.index,
+        y='TotalRevenue',
+        labels={'TotalRevenue': 'Monthly Revenue (USD)'},
+        template=chart_template,
+        markers=True,
+        render_mode='webgl'
+    )
+    fig_time.update_traces(fill='tozeroy')
+    # uirevision on each figure keeps zoom/pan state across reruns instead of forcing a full relayout
+    fig_time.update_layout(height=400, uirevision="static")
+    return fig_time.to_json()
+
+@st.cache_data
+def build_category_chart_json(file_path, mtime, start_date, end_date, categories, sources):
+    """Build the Sales by Product Category figure for one filter state and return it already encoded as JSON."""
+    sales_by_category = compute_filtered(file_path, mtime, start_date, end_date, categories, sources)["by_cat"]
+    fig_cat = px.bar(
+        sales_by_category,
+        orientation='h',
+        labels={'value': 'Total Revenue (USD)', 'index': 'Category'},
+        template=chart_template,
+        color=sales_by_category.values,
+        color_continuous_scale=px.colors.sequential.Teal
+    )
+    fig_cat.update_layout(height=400, coloraxis_showscale=False, uirevision="static")
+    return fig_cat.to_json()
+
+def render_charts(filter_key):
+    """Draw the revenue trend and category breakdown for one filter state."""
+    col_left, col_right = st.columns((7, 5))
+
+    with col_left:
+        st.subheader("Revenue Over Time")
+        # Rebuilding from cached JSON skips px.line and the datetime encoding on repeat filter states
+        fig_time = pio.from_json(build_time_chart_json(*filter_key))
+        st.plotly_chart(fig_time, use_container_width=True, config=chart_config)
+
+    with col_right:
+        st.subheader("Sales by Product Category")
+        fig_cat = pio.from_json(build_category_chart_json(*filter_key))
+        st.plotly_chart(fig_cat, use_container_width=True, config=chart_config)
+
+
+def render_map(results):
+    """Draw the state choropleth for one filter state."""
+    st.subheader("Geographical Sales Performance")
+    sales_by_state = results["by_state"]
+
+    fig_map = px.choropleth(
+        sales_by_state,
+        locations='State',
+        locationmode='USA-states',
+        color='TotalRevenue',
+        scope='usa',
+        color_continuous_scale="Teal",
+        labels={'TotalRevenue': 'Total Revenue'}
+    )
+    fig_map.update_layout(
+        geo=dict(bgcolor='rgba(0,0,0,0)'),
+        height=500,
+        paper_bgcolor='rgba(0,0,0,0)',
+        uirevision="static",
+    )
+    st.plotly_chart(fig_map, use_container_width=True, config=chart_config)
+
+
+# --- DETAILED DATA VIEW ---
+def render_raw_data(filter_key, filtered_df):
+    """Show the filtered transactions, capped at MAX_GRID_ROWS unless the user asks for more."""
+    st.subheader("Drill-Down: Raw Data Explorer")
+    st.markdown("Filter and sort the raw data to find specific transactions. This table is fully interactive.")
+
+    # Only the first rows are serialized to the browser; larger selections can be expanded with the slider
+    grid_rows = len(filtered_df)
+    if grid_rows > MAX_GRID_ROWS:
+        grid_rows = st.slider("Rows to display", min_value=100, max_value=len(filtered_df), value=MAX_GRID_ROWS, step=100)
+
+    # Both frames share load_data's row index, so the detail columns line up by label
+    file_path, mtime = filter_key[:2]
+    grid_df = filtered_df.head(grid_rows)
+    grid_df = grid_df.join(load_detail(file_path, mtime).loc[grid_df.index])
+    # Keep only the displayed columns: column_order merely hides the rest, they would still be serialized (e.g. MonthCode)
+    grid_df = grid_df[GRID_COLUMNS]
+
+    st.dataframe(
+        grid_df,
+        use_container_width=True,
+        height=400,
+        column_order=GRID_COLUMNS,
+        column_config={
+            "OrderDate": st.column_config.DateColumn(format="YYYY-MM-DD"),
+            "Price": st.column_config.NumberColumn(format="$%.2f"),
+            "TotalRevenue": st.column_config.NumberColumn(format="$%.2f"),
+        },
+        hide_index=True,
+    )
@@ -1,8 +1,7 @@
 # generate_ad_data.py
 import pandas as pd
 import numpy as np
-import random
-from datetime import date, timedelta
+from datetime import date
 
 # --- Configuration ---
 START_DATE = date(2024, 1, 1)
@@ -20,41 +19,49 @@ AD_CREATIVES = {
 }
 
 # --- Data Generation Logic ---
-data = []
-for day_num in range(DAYS_OF_DATA):
-    current_date = START_DATE + timedelta(days=day_num)
-    for platform, metrics in PLATFORMS.items():
-        for campaign in CAMPAIGNS:
-            # Choose a random creative type and a specific creative
-            creative_type = random.choice(list(AD_CREATIVES.keys()))
-            creative_name = random.choice(AD_CREATIVES[creative_type])
-
-            # Generate core metrics
-            impressions = random.randint(5000, 20000)
-            clicks = int(impressions * random.uniform(0.01, 0.06))
-            spend = clicks * random.uniform(metrics['cpc_range'][0], metrics['cpc_range'][1])
-            conversions = int(clicks * random.uniform(metrics['conv_rate_range'][0], metrics['conv_rate_range'][1]))
-            revenue = conversions * random.uniform(50, 300) # Revenue per conversion
-
-            data.append([
-                current_date.strftime("%Y-%m-%d"),
-                platform,
-                campaign,
-                creative_type,
-                creative_name,
-                impressions,
-                clicks,
-                round(spend, 2),
-                conversions,
-                round(revenue, 2)
-            ])
+# One row per (day, platform, campaign), with every metric drawn for the whole grid at once
+rng = np.random.default_rng()
+platforms = np.array(list(PLATFORMS))
+campaigns = np.array(CAMPAIGNS)
+D, P, C = np.meshgrid(np.arange(DAYS_OF_DATA), np.arange(len(platforms)), np.arange(len(campaigns)), indexing='ij')
+flat_D, flat_P, flat_C = D.ravel(), P.ravel(), C.ravel()
+N = flat_D.size
+
+# Per-row platform ranges looked up from the platform index
+cpc_lo = np.array([PLATFORMS[p]['cpc_range'][0] for p in platforms])[flat_P]
+cpc_hi = np.array([PLATFORMS[p]['cpc_range'][1] for p in platforms])[flat_P]
+conv_lo = np.array([PLATFORMS[p]['conv_rate_range'][0] for p in platforms])[flat_P]
+conv_hi = np.array([PLATFORMS[p]['conv_rate_range'][1] for p in platforms])[flat_P]
+
+# Choose a random creative type and then a specific creative of that type
+creative_types = np.array(list(AD_CREATIVES.keys()))
+creative_names = np.array([name for names in AD_CREATIVES.values() for name in names])
+creative_counts = np.array([len(names) for names in AD_CREATIVES.values()])
+creative_offsets = np.concatenate(([0], np.cumsum(creative_counts)[:-1]))
+type_idx = rng.integers(0, len(creative_types), N)
+name_idx = creative_offsets[type_idx] + (rng.random(N) * creative_counts[type_idx]).astype(int)
+
+# Generate core metrics
+impressions = rng.integers(5000, 20001, N)
+clicks = (impressions * rng.uniform(0.01, 0.06, N)).astype(int)
+spend = clicks * rng.uniform(cpc_lo, cpc_hi)
+conversions = (clicks * rng.uniform(conv_lo, conv_hi)).astype(int)
+revenue = conversions * rng.uniform(50, 300, N) # Revenue per conversion
 
 # --- Create DataFrame and Save to CSV ---
-columns = [
-    'Date', 'Platform', 'Campaign', 'CreativeType', 'CreativeName',
-    'Impressions', 'Clicks', 'Spend', 'Conversions', 'Revenue'
-]
-df = pd.DataFrame(data, columns=columns)
+dates = pd.Timestamp(START_DATE) + pd.to_timedelta(flat_D, unit='D')
+df = pd.DataFrame({
+    'Date': dates.strftime("%Y-%m-%d"),
+    'Platform': platforms[flat_P],
+    'Campaign': campaigns[flat_C],
+    'CreativeType': creative_types[type_idx],
+    'CreativeName': creative_names[name_idx],
+    'Impressions': impressions,
+    'Clicks': clicks,
+    'Spend': spend.round(2),
+    'Conversions': conversions,
+    'Revenue': revenue.round(2),
+})
 
 # Save the file
 file_path = "data/ad_performance_data.csv"
@@ -1,8 +1,9 @@
 # generate_customer_data.py
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from convert_to_parquet import CUSTOMER_PARQUET_PATH, SENTIMENT_COLUMNS, write_customer_parquet
 
 # --- Configuration ---
 NUM_RECORDS = 200
@@ -17,65 +18,57 @@ CUSTOMERS = [
 ]
 
 # --- Data Generation Logic ---
-data = []
-for i, customer_name in enumerate(random.sample(CUSTOMERS, len(CUSTOMERS))):
-    # Base metrics
-    purchase_frequency = random.randint(1, 20) # purchases in the last year
-    last_purchase_days_ago = random.randint(1, 365)
-    last_purchase_date = END_DATE - timedelta(days=last_purchase_days_ago)
-    avg_order_value = round(random.uniform(50, 1000), 2)
-    
-    # Engagement and support metrics
-    support_tickets = random.randint(0, 5)
-    engagement_score = random.randint(20, 99) # e.g., email opens, web visits
-    
-    # --- AI Simulation ---
-    # 1. Health Score Calculation (simulated)
-    # Higher score is better. Penalize for old purchases and high support tickets.
-    recency_score = max(0, 100 - last_purchase_days_ago / 3.65)
-    frequency_score = min(100, purchase_frequency * 10)
-    support_score = max(0, 100 - support_tickets * 20)
-    health_score = int(0.5 * recency_score + 0.3 * frequency_score + 0.2 * support_score)
-    
-    # 2. Churn Risk Segmentation (simulated)
-    if health_score < 45:
-        churn_risk = 'High'
-    elif 45 <= health_score < 75:
-        churn_risk = 'Medium'
-    else:
-        churn_risk = 'Low'
+# Every metric is drawn as a whole column at once; each customer appears exactly once, in random order
+rng = np.random.default_rng()
+n = len(CUSTOMERS)
+customer_names = rng.permutation(CUSTOMERS)
+
+# Base metrics
+purchase_frequency = rng.integers(1, 21, n) # purchases in the last year
+last_purchase_days_ago = rng.integers(1, 366, n)
+last_purchase_date = pd.Timestamp(END_DATE).normalize() - pd.to_timedelta(last_purchase_days_ago, unit='D')
+avg_order_value = rng.uniform(50, 1000, n).round(2)
+
+# Engagement and support metrics
+support_tickets = rng.integers(0, 6, n)
+engagement_score = rng.integers(20, 100, n) # e.g., email opens, web visits
 
-    # 3. Predicted LTV (simulated)
-    predicted_ltv = avg_order_value * purchase_frequency * random.uniform(1.5, 3.0)
+# --- AI Simulation ---
+# 1. Health Score Calculation (simulated)
+# Higher score is better. Penalize for old purchases and high support tickets.
+recency_score = np.maximum(0, 100 - last_purchase_days_ago / 3.65)
+frequency_score = np.minimum(100, purchase_frequency * 10)
+support_score = np.maximum(0, 100 - support_tickets * 20)
+health_score = (0.5 * recency_score + 0.3 * frequency_score + 0.2 * support_score).astype(int)
 
-    # 4. Sentiment Score (simulated for trendline)
-    # Generate a time series of sentiment scores for the last 12 months
-    sentiment_history = [max(0.1, min(1.0, np.random.normal(loc=health_score/100, scale=0.15))) for _ in range(12)]
-    
-    data.append([
-        f"CUST-{101 + i}",
-        customer_name,
-        last_purchase_date.strftime("%Y-%m-%d"),
-        purchase_frequency,
-        avg_order_value,
-        support_tickets,
-        engagement_score,
-        health_score,
-        churn_risk,
-        round(predicted_ltv, 2),
-        sentiment_history
-    ])
+# 2. Churn Risk Segmentation (simulated)
+churn_risk = np.select([health_score < 45, health_score < 75], ['High', 'Medium'], default='Low')
+
+# 3. Predicted LTV (simulated)
+predicted_ltv = avg_order_value * purchase_frequency * rng.uniform(1.5, 3.0, n)
+
+# 4. Sentiment Score (simulated for trendline)
+# A 12-month sentiment history per customer, centred on their health score
+sentiment_matrix = np.clip(rng.normal(loc=health_score[:, None] / 100, scale=0.15, size=(n, 12)), 0.1, 1.0)
 
 # --- Create DataFrame and Save to CSV ---
-columns = [
-    'CustomerID', 'CustomerName', 'LastPurchaseDate', 'PurchaseFrequency',
-    'AvgOrderValue', 'SupportTickets', 'EngagementScore', 'HealthScore',
-    'ChurnRisk', 'PredictedLTV', 'SentimentHistory'
-]
-df = pd.DataFrame(data, columns=columns)
+df = pd.DataFrame({
+    'CustomerID': np.char.add("CUST-", (101 + np.arange(n)).astype(str)),
+    'CustomerName': customer_names,
+    'LastPurchaseDate': last_purchase_date.strftime("%Y-%m-%d"),
+    'PurchaseFrequency': purchase_frequency,
+    'AvgOrderValue': avg_order_value,
+    'SupportTickets': support_tickets,
+    'EngagementScore': engagement_score,
+    'HealthScore': health_score,
+    'ChurnRisk': churn_risk,
+    'PredictedLTV': predicted_ltv.round(2),
+})
+df[SENTIMENT_COLUMNS] = sentiment_matrix
 
-# Save the file
+# Save the file; the dashboard reads the Parquet copy, the CSV stays as the plain-text export
 file_path = "data/customer_intelligence_data.csv"
 df.to_csv(file_path, index=False)
+write_customer_parquet(df, CUSTOMER_PARQUET_PATH)
 
-print(f"✅ Success! Data file '{file_path}' created with {len(df)} records.")
+print(f"✅ Success! Data files '{file_path}' and '{CUSTOMER_PARQUET_PATH}' created with {len(df)} records.")
@@ -1,8 +1,9 @@
 # generate_data.py
 import pandas as pd
 import numpy as np
-import random
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from convert_to_parquet import SALES_PARQUET_PATH, write_sales_parquet
 
 # --- Configuration ---
 NUM_RECORDS = 500
@@ -26,49 +27,39 @@ LOCATIONS = {
 MARKETING_SOURCES = ['Google Ads', 'Organic Search', 'Social Media', 'Referral', 'Email Campaign']
 
 # --- Data Generation Logic ---
-data = []
-for _ in range(NUM_RECORDS):
-    # Choose a random category and then a product from that category
-    category = random.choice(list(PRODUCTS.keys()))
-    product = random.choice(PRODUCTS[category])
-    
-    # Generate random order date
-    time_between_dates = END_DATE - START_DATE
-    days_between_dates = time_between_dates.days
-    random_number_of_days = random.randrange(days_between_dates)
-    order_date = START_DATE + timedelta(days=random_number_of_days)
-    
-    # Generate other random data
-    quantity = np.random.randint(1, 10)
-    price = round(np.random.uniform(29.99, 499.99), 2)
-    customer_name = random.choice(CUSTOMERS)
-    state = random.choice(list(LOCATIONS.keys()))
-    state_abbr = LOCATIONS[state]
-    marketing_source = random.choice(MARKETING_SOURCES)
-    satisfaction_score = np.random.randint(3, 6) # Skew towards higher satisfaction
-    
-    data.append([
-        f"ORD-{1001 + _}",
-        order_date.strftime("%Y-%m-%d"),
-        customer_name,
-        state_abbr,
-        product,
-        category,
-        quantity,
-        price,
-        marketing_source,
-        satisfaction_score
-    ])
+# Every column is drawn in one batch and picked from NumPy arrays of the choice lists
+rng = np.random.default_rng()
+categories = np.array(list(PRODUCTS.keys()))
+products = np.array([product for names in PRODUCTS.values() for product in names])
+product_counts = np.array([len(names) for names in PRODUCTS.values()])
+product_offsets = np.concatenate(([0], np.cumsum(product_counts)[:-1]))
+states = np.array(list(LOCATIONS.values()))
+
+# Choose a random category and then a product from that category
+cat_idx = rng.integers(0, len(categories), NUM_RECORDS)
+prod_idx = product_offsets[cat_idx] + (rng.random(NUM_RECORDS) * product_counts[cat_idx]).astype(int)
+
+# Generate random order dates
+days_between_dates = (END_DATE - START_DATE).days
+order_dates = pd.Timestamp(START_DATE) + pd.to_timedelta(rng.integers(0, days_between_dates, NUM_RECORDS), unit='D')
 
 # --- Create DataFrame and Save to CSV ---
-columns = [
-    'OrderID', 'OrderDate', 'CustomerName', 'State', 'Product', 'Category',
-    'Quantity', 'Price', 'MarketingSource', 'SatisfactionScore'
-]
-df = pd.DataFrame(data, columns=columns)
+df = pd.DataFrame({
+    'OrderID': np.char.add("ORD-", (1001 + np.arange(NUM_RECORDS)).astype(str)),
+    'OrderDate': order_dates.strftime("%Y-%m-%d"),
+    'CustomerName': np.array(CUSTOMERS)[rng.integers(0, len(CUSTOMERS), NUM_RECORDS)],
+    'State': states[rng.integers(0, len(states), NUM_RECORDS)],
+    'Product': products[prod_idx],
+    'Category': categories[cat_idx],
+    'Quantity': rng.integers(1, 10, NUM_RECORDS),
+    'Price': rng.uniform(29.99, 499.99, NUM_RECORDS).round(2),
+    'MarketingSource': np.array(MARKETING_SOURCES)[rng.integers(0, len(MARKETING_SOURCES), NUM_RECORDS)],
+    'SatisfactionScore': rng.integers(3, 6, NUM_RECORDS), # Skew towards higher satisfaction
+})
 
-# Save the file
+# Save the file; the dashboard reads the Parquet copy, the CSV stays as the plain-text export
 file_path = "data/innovategear_sales_data.csv"
 df.to_csv(file_path, index=False)
+write_sales_parquet(df, SALES_PARQUET_PATH)
 
-print(f"✅ Success! Data file '{file_path}' created with {len(df)} records.")
+print(f"✅ Success! Data files '{file_path}' and '{SALES_PARQUET_PATH}' created with {len(df)} records.")
@@ -1,10 +1,14 @@
 # pages/2_🔮_Customer_Crystal_Ball.py
 
+import os
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import ast # To safely evaluate string-formatted lists
+import plotly.io as pio
+
+from core.common import load_css, transparent_dark
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -13,27 +17,102 @@ st.set_page_config(
     layout="wide",
 )
 
-# --- FUNCTION TO LOAD CUSTOM CSS ---
-def load_css(file_name):
-    """A function to load a CSS file from the root directory."""
-    with open(file_name) as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
 # Load the custom CSS from the root directory
 load_css("style.css")
 
 
 # --- DATA LOADING AND PREPARATION ---
-@st.cache_data
-def load_data(file_path):
-    """Load and preprocess the customer intelligence data."""
-    data = pd.read_csv(file_path)
-    # Convert string representation of list to actual list
-    data['SentimentHistory'] = data['SentimentHistory'].apply(ast.literal_eval)
+# Cached as a shared resource keyed on the file's mtime: no copy per rerun, so the page must never modify df in place
+@st.cache_resource
+def load_data(file_path, mtime):
+    """Load the customer intelligence data; a new mtime forces a re-read."""
+    return pd.read_parquet(file_path, engine="pyarrow", memory_map=True)
+
+@st.cache_resource
+def load_risk_map(file_path, mtime):
+    """Map each customer name to its churn risk, built once per data file."""
+    data = load_data(file_path, mtime)
+    return dict(zip(data['CustomerName'], data['ChurnRisk']))
+
+# Next best actions per churn risk: the callout used for the heading and the action list shown beneath it
+ACTION_TEMPLATES = {
+    'High': (st.warning,
+             "- **Immediate Outreach:** Personal call from a senior account manager to address any issues.\n"
+             "- **Exclusive Offer:** Provide a significant loyalty discount on their next purchase.\n"
+             "- **Feedback Survey:** Send a survey to understand their dissatisfaction."),
+    'Medium': (st.info,
+               "- **Personalized Email:** Send a check-in email highlighting new products relevant to them.\n"
+               "- **Engage on Social Media:** Like or comment on their company's social media posts.\n"
+               "- **Offer Early Access:** Give them a sneak peek at an upcoming feature or product."),
+    'Low': (st.success,
+            "- **Nurture Relationship:** Send a thank-you note or a small, unexpected gift.\n"
+            "- **Request a Testimonial:** Ask them to share their positive experience.\n"
+            "- **Upsell Opportunity:** Introduce them to premium services or complementary products."),
+}
+
+def filter_by_risk(data, selected_risk):
+    """Rows for one churn-risk segment, or the whole frame for 'All'."""
+    if selected_risk != 'All':
+        return data[data['ChurnRisk'] == selected_risk]
     return data
 
+# Monthly sentiment history is stored as one column per month, oldest first
+sent_cols = [f"Sent_{i}" for i in range(12)]
+
+@st.cache_data
+def build_charts_json(file_path, mtime, selected_risk):
+    """Build the churn pie, LTV bar and sentiment trend for one risk filter, returned already encoded as JSON."""
+    filtered_df = filter_by_risk(load_data(file_path, mtime), selected_risk)
+
+    # ChurnRisk is categorical, so the segment sizes are one bincount over its codes
+    risk_levels = filtered_df['ChurnRisk'].cat.categories
+    risk_counts = np.bincount(filtered_df['ChurnRisk'].cat.codes.to_numpy(), minlength=len(risk_levels))
+    churn_counts = pd.Series(risk_counts, index=risk_levels)
+    churn_counts = churn_counts[churn_counts > 0].sort_values(ascending=False)
+    fig_pie = px.pie(
+        values=churn_counts.values,
+        names=churn_counts.index,
+        title="Customer Base by Churn Risk",
+        color=churn_counts.index,
+        color_discrete_map={'High': '#B22222', 'Medium': '#DAA520', 'Low': '#2E8B57'},
+        template=transparent_dark()
+    )
+
+    ltv_by_risk = filtered_df.groupby('ChurnRisk', observed=True)['PredictedLTV'].sum().sort_values(ascending=False)
+    fig_ltv = px.bar(
+        ltv_by_risk,
+        x=ltv_by_risk.index,
+        y=ltv_by_risk.values,
+        title="Total Predicted LTV by Risk Segment",
+        labels={'x': 'Churn Risk Segment', 'y': 'Total Predicted LTV (USD)'},
+        color=ltv_by_risk.index,
+        color_discrete_map={'High': '#B22222', 'Medium': '#DAA520', 'Low': '#2E8B57'},
+        template=transparent_dark()
+    )
+
+    # A 12-value mean straight off the sentiment columns; no intermediate customer-by-month frame
+    avg_sentiment = pd.DataFrame({
+        'Month': [f"Month -{11-i}" for i in range(12)],
+        'AverageSentiment': filtered_df[sent_cols].to_numpy(dtype=np.float32).mean(axis=0),
+    })
+    fig_sentiment = px.area(
+        avg_sentiment,
+        x='Month',
+        y='AverageSentiment',
+        title="Average Customer Sentiment Over Time",
+        markers=True,
+        template=transparent_dark(),
+        labels={'AverageSentiment': 'Sentiment Score (0.0 to 1.0)'}
+    )
+    fig_sentiment.update_yaxes(range=[0, 1])
+
+    return {"pie": fig_pie.to_json(), "ltv": fig_ltv.to_json(), "sentiment": fig_sentiment.to_json()}
+
 try:
-    df = load_data("data/customer_intelligence_data.csv")
+    data_path = "data/customer_intelligence_data.parquet"
+    data_mtime = os.path.getmtime(data_path)
+    df = load_data(data_path, data_mtime)
+    risk_map = load_risk_map(data_path, data_mtime)
 except FileNotFoundError:
     st.error("Data file not found. Please run 'generate_customer_data.py' first.")
     st.stop()
@@ -58,11 +137,9 @@ selected_risk = st.sidebar.selectbox(
     index=0
 )
 
-# Apply filters
-if selected_risk != 'All':
-    filtered_df = df[df['ChurnRisk'] == selected_risk].copy()
-else:
-    filtered_df = df.copy()
+# Apply filters; the charts for each risk segment are built once and served from the cache afterwards
+filtered_df = filter_by_risk(df, selected_risk)
+charts = build_charts_json(data_path, data_mtime, selected_risk)
 
 
 # --- KEY FEATURES ---
@@ -71,19 +148,22 @@ else:
 st.subheader("Customer Health Scorecard")
 st.markdown("A real-time, color-coded grid of your customers. The health score (0-100) is an AI-generated metric based on purchase frequency, recency, and support history. Green is good, red is at-risk.")
 
-def get_color_for_score(score):
-    if score > 75:
-        return f"background-color: #2E8B57; color: white" # SeaGreen
-    elif score > 45:
-        return f"background-color: #DAA520; color: white" # GoldenRod
-    else:
-        return f"background-color: #B22222; color: white" # FireBrick
-
-styled_df = filtered_df[['CustomerName', 'HealthScore', 'ChurnRisk', 'PredictedLTV']].sort_values('HealthScore', ascending=False)
-styled_df = styled_df.style.apply(lambda x: [get_color_for_score(v) for v in x], subset=['HealthScore']) \
-                       .format({'PredictedLTV': '${:,.2f}'})
-
-st.dataframe(styled_df, use_container_width=True, height=35 * (len(filtered_df) + 1))
+# Health scores render as client-side progress bars, so no Styler HTML is built per rerun. The colour comes from a
+# band marker with the scorecard's original cut-offs: green above 75, amber above 45, red otherwise.
+scorecard_df = filtered_df[['CustomerName', 'HealthScore', 'ChurnRisk', 'PredictedLTV']].sort_values('HealthScore', ascending=False)
+health_scores = scorecard_df['HealthScore'].to_numpy()
+scorecard_df.insert(1, 'Health', np.select([health_scores > 75, health_scores > 45], ['🟢', '🟡'], default='🔴'))
+
+st.dataframe(
+    scorecard_df,
+    use_container_width=True,
+    # A fixed height keeps the grid virtualized: only the visible rows are drawn, however many customers match
+    height=420,
+    column_config={
+        "HealthScore": st.column_config.ProgressColumn(format="%d", min_value=0, max_value=100),
+        "PredictedLTV": st.column_config.NumberColumn(format="dollar"),
+    },
+)
 
 
 # --- SPLIT LAYOUT FOR CHARTS ---
@@ -92,17 +172,7 @@ col1, col2 = st.columns(2)
 with col1:
     # 2. Churn Risk Segmentation
     st.subheader("Churn Risk Segmentation")
-    churn_counts = filtered_df['ChurnRisk'].value_counts()
-    fig_pie = px.pie(
-        values=churn_counts.values,
-        names=churn_counts.index,
-        title="Customer Base by Churn Risk",
-        color=churn_counts.index,
-        color_discrete_map={'High': '#B22222', 'Medium': '#DAA520', 'Low': '#2E8B57'},
-        template="plotly_dark"
-    )
-    fig_pie.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-    st.plotly_chart(fig_pie, use_container_width=True)
+    st.plotly_chart(pio.from_json(charts["pie"]), use_container_width=True)
 
 with col2:
     # 4. AI-Recommended Actions
@@ -115,24 +185,10 @@ with col2:
         options=filtered_df['CustomerName']
     )
     
-    customer_data = df[df['CustomerName'] == customer_for_action].iloc[0]
-    risk = customer_data['ChurnRisk']
-    
-    if risk == 'High':
-        st.warning(f"**Action for {customer_for_action} (High Risk):**")
-        st.markdown("- **Immediate Outreach:** Personal call from a senior account manager to address any issues.\n"
-                    "- **Exclusive Offer:** Provide a significant loyalty discount on their next purchase.\n"
-                    "- **Feedback Survey:** Send a survey to understand their dissatisfaction.")
-    elif risk == 'Medium':
-        st.info(f"**Action for {customer_for_action} (Medium Risk):**")
-        st.markdown("- **Personalized Email:** Send a check-in email highlighting new products relevant to them.\n"
-                    "- **Engage on Social Media:** Like or comment on their company's social media posts.\n"
-                    "- **Offer Early Access:** Give them a sneak peek at an upcoming feature or product.")
-    else:
-        st.success(f"**Action for {customer_for_action} (Low Risk):**")
-        st.markdown("- **Nurture Relationship:** Send a thank-you note or a small, unexpected gift.\n"
-                    "- **Request a Testimonial:** Ask them to share their positive experience.\n"
-                    "- **Upsell Opportunity:** Introduce them to premium services or complementary products.")
+    risk = risk_map[customer_for_action]
+    callout, actions = ACTION_TEMPLATES[risk]
+    callout(f"**Action for {customer_for_action} ({risk} Risk):**")
+    st.markdown(actions)
 
 st.divider()
 
@@ -143,43 +199,13 @@ tab1, tab2 = st.tabs(["Predicted Lifetime Value (LTV)", "Customer Sentiment Tren
 with tab1:
     # 3. Predicted Lifetime Value (LTV) Forecast
     st.markdown("This chart forecasts the total revenue we can expect from different customer cohorts over time. It helps prioritize high-value segments.")
-    ltv_by_risk = filtered_df.groupby('ChurnRisk')['PredictedLTV'].sum().sort_values(ascending=False)
-    fig_ltv = px.bar(
-        ltv_by_risk,
-        x=ltv_by_risk.index,
-        y=ltv_by_risk.values,
-        title="Total Predicted LTV by Risk Segment",
-        labels={'x': 'Churn Risk Segment', 'y': 'Total Predicted LTV (USD)'},
-        color=ltv_by_risk.index,
-        color_discrete_map={'High': '#B22222', 'Medium': '#DAA520', 'Low': '#2E8B57'},
-        template="plotly_dark"
-    )
-    fig_ltv.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-    st.plotly_chart(fig_ltv, use_container_width=True)
+    st.plotly_chart(pio.from_json(charts["ltv"]), use_container_width=True)
 
 
 with tab2:
     # 5. Sentiment Analysis Trendline
     st.markdown("This graph visually tracks the average customer sentiment over the last 12 months by analyzing feedback from emails, surveys, and reviews.")
-    
-    # Prepare data for sentiment trend
-    sentiment_df = pd.DataFrame(filtered_df['SentimentHistory'].to_list(), index=filtered_df['CustomerName'])
-    sentiment_df.columns = [f"Month -{11-i}" for i in range(12)]
-    avg_sentiment = sentiment_df.mean(axis=0).rename('AverageSentiment').reset_index()
-    avg_sentiment.columns = ['Month', 'AverageSentiment']
-    
-    fig_sentiment = px.area(
-        avg_sentiment,
-        x='Month',
-        y='AverageSentiment',
-        title="Average Customer Sentiment Over Time",
-        markers=True,
-        template="plotly_dark",
-        labels={'AverageSentiment': 'Sentiment Score (0.0 to 1.0)'}
-    )
-    fig_sentiment.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-    fig_sentiment.update_yaxes(range=[0, 1])
-    st.plotly_chart(fig_sentiment, use_container_width=True)
+    st.plotly_chart(pio.from_json(charts["sentiment"]), use_container_width=True)
 
 st.sidebar.markdown("---")
 st.sidebar.info("This is a demo dashboard built by Home Marketing & Consulting.")
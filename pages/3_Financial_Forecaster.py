@@ -1,10 +1,14 @@
 # pages/3_💰_Financial_Forecaster.py
 
+import os
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from core.common import downsample_lttb, load_css, transparent_dark
+
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
     page_title="Dynamic Financial Forecaster",
@@ -12,26 +16,66 @@ st.set_page_config(
     layout="wide",
 )
 
-# --- FUNCTION TO LOAD CUSTOM CSS ---
-def load_css(file_name):
-    """A function to load a CSS file from the root directory."""
-    with open(file_name) as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
 # Load the custom CSS from the root directory
 load_css("style.css")
 
 
 # --- DATA LOADING AND PREPARATION ---
-@st.cache_data
-def load_data(file_path):
-    """Load and preprocess the financial data."""
-    data = pd.read_csv(file_path)
-    data['Date'] = pd.to_datetime(data['Date'])
+# Both layers are keyed on the file's mtime, so a regenerated CSV is re-read rather than served from the old frame
+@st.cache_data(ttl=3600)
+def load_data(file_path, mtime):
+    """Load and preprocess the financial data; a new mtime forces a re-read."""
+    data = pd.read_csv(file_path, dtype={'Type': 'category', 'Category': 'category'}, parse_dates=['Date'])
+    # Month buckets computed once here: the first day of each month, and its 'YYYY-MM' label for the heatmap
+    data['Month'] = data['Date'].to_numpy().astype('datetime64[M]').astype('datetime64[ns]')
+    data['MonthStr'] = data['Month'].dt.strftime('%Y-%m')
     return data
 
+@st.cache_data(ttl=3600)
+def compute_historical(file_path, mtime):
+    """Aggregate the historical figures the sliders never change: monthly cash flow, expense pivot, income by category and anomalies."""
+    df = load_data(file_path, mtime)
+
+    # Monthly income, expense and cash flow
+    monthly_summary = df.groupby(['Month', 'Type'], observed=True)['Amount'].sum().unstack(fill_value=0)
+    monthly_summary['CashFlow'] = monthly_summary['Income'] - monthly_summary['Expense']
+
+    # Expense heatmap grid, built from just the three columns it needs
+    expenses_df = df.loc[df['Type'].to_numpy() == 'Expense', ['Category', 'MonthStr', 'Amount']]
+    expense_pivot = expenses_df.groupby(['Category', 'MonthStr'], observed=True)['Amount'].sum().unstack(fill_value=0)
+    expense_pivot.columns.name = 'Month'
+
+    # AI Simulation: Flag anomalies
+    # Mean and sample std of each category's non-zero months: two row-wise reductions and one broadcast comparison
+    spent = expense_pivot.where(expense_pivot > 0)
+    thresholds = spent.mean(axis=1) + 3 * spent.std(axis=1)
+    flagged = expense_pivot.stack()[expense_pivot.gt(thresholds, axis=0).stack()]
+
+    anomalies = []
+    for (category, month), amount in flagged.items():
+        threshold = thresholds[category]
+        # --- FIX: Escape the '$' with a '\' to ensure it's treated as a literal character. ---
+        anomalies.append(f"High spending of **\${amount:,.2f}** in **{category}** for month **{month}** (Threshold: **\${threshold:,.2f}**)")
+
+    # Income by category for the treemap
+    income_df = df[df['Type'] == 'Income']
+    profit_by_cat = income_df.groupby('Category', observed=True)['Amount'].sum().reset_index()
+    # The summary only needs the largest income stream, so take its position instead of sorting the frame
+    top_income_stream = profit_by_cat['Category'].iat[profit_by_cat['Amount'].to_numpy().argmax()]
+
+    return {
+        "monthly_summary": monthly_summary,
+        "last_income": monthly_summary['Income'].iloc[-1],
+        "last_expense": monthly_summary['Expense'].iloc[-1],
+        "expense_pivot": expense_pivot,
+        "profit_by_cat": profit_by_cat,
+        "top_income_stream": top_income_stream,
+        "anomalies": anomalies,
+    }
+
 try:
-    df = load_data("data/financial_data.csv")
+    data_path = "data/financial_data.csv"
+    historical = compute_historical(data_path, os.path.getmtime(data_path))
 except FileNotFoundError:
     st.error("Data file not found. Please run 'generate_financial_data.py' first.")
     st.stop()
@@ -41,66 +85,120 @@ except FileNotFoundError:
 st.title("💰 The Dynamic Financial Forecaster")
 st.markdown("### AI-Driven Profitability & Cash Flow")
 st.markdown("""
-This tool moves beyond static financial reports. Use the sliders in the sidebar to create dynamic,
+This tool moves beyond static financial reports. Use the what-if sliders below to create dynamic,
 AI-driven forecasts and simulate business scenarios. See the future impact on your cash flow instantly.
 """)
 st.divider()
 
-# --- SIDEBAR FOR "WHAT-IF" SCENARIOS ---
-st.sidebar.header("What-If Scenario Planner")
-st.sidebar.markdown("Adjust these sliders to forecast future financial performance.")
-
-# Sliders for forecasting
-sales_growth_rate = st.sidebar.slider("Future Monthly Sales Growth (%)", -10, 20, 3) / 100.0
-new_monthly_expense = st.sidebar.slider("New Monthly Recurring Expense ($)", 0, 10000, 1500)
-
-
-# --- FEATURE 1: INTERACTIVE "WHAT-IF" CASH FLOW PROJECTIONS ---
-st.subheader("Interactive 'What-If' Cash Flow Projections")
-st.markdown("This chart combines your historical cash flow with an AI-powered forecast. Change the sliders on the left to see how your decisions could impact your future cash position.")
-
-# Prepare historical data
-df_monthly = df.copy()
-df_monthly['Month'] = df_monthly['Date'].dt.to_period('M').dt.to_timestamp()
-monthly_summary = df_monthly.groupby(['Month', 'Type'])['Amount'].sum().unstack().fillna(0)
-monthly_summary['CashFlow'] = monthly_summary['Income'] - monthly_summary['Expense']
-
-# Create forecast
-last_known_month = monthly_summary.index[-1]
-last_income = monthly_summary['Income'].iloc[-1]
-last_expense = monthly_summary['Expense'].iloc[-1]
-forecast_dates = [last_known_month + pd.DateOffset(months=i) for i in range(1, 13)]
-forecast_data = []
-
-for i, month in enumerate(forecast_dates):
-    forecasted_income = last_income * ((1 + sales_growth_rate) ** (i + 1))
-    forecasted_expense = last_expense + new_monthly_expense
-    forecasted_cashflow = forecasted_income - forecasted_expense
-    forecast_data.append([month, forecasted_income, forecasted_expense, forecasted_cashflow])
-
-forecast_df = pd.DataFrame(forecast_data, columns=['Month', 'Income', 'Expense', 'CashFlow']).set_index('Month')
-
-# Combine historical and forecast data
-combined_cashflow = pd.concat([monthly_summary['CashFlow'], forecast_df['CashFlow']])
-
-# Plotting
-fig_cashflow = go.Figure()
-fig_cashflow.add_trace(go.Scatter(
-    x=combined_cashflow.index, y=combined_cashflow.values,
-    mode='lines+markers', name='Cash Flow',
-    line=dict(color='#2E8B57', width=3)
-))
-# Add a vertical line to separate history from forecast
-fig_cashflow.add_vline(x=last_known_month, line_width=2, line_dash="dash", line_color="gray")
-fig_cashflow.add_annotation(x=last_known_month, y=combined_cashflow.max(), text="Forecast ->", showarrow=True, arrowhead=1)
-
-fig_cashflow.update_layout(
-    title="Historical vs. Forecasted Monthly Cash Flow",
-    template="plotly_dark", paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-    yaxis_title="Cash Flow (USD)"
-)
-st.plotly_chart(fig_cashflow, use_container_width=True)
+# Everything that depends on the sliders lives in this fragment, so moving a slider reruns only this block and leaves
+# the heatmap and treemap untouched. Fragments cannot write to the sidebar, so the sliders sit at the top of the fragment.
+@st.fragment
+def what_if_fragment():
+    """Draw the what-if sliders, the cash flow forecast and the automated summary that depends on it."""
+    st.subheader("What-If Scenario Planner")
+    st.markdown("Adjust these sliders to forecast future financial performance.")
+
+    # Sliders for forecasting
+    slider_left, slider_right = st.columns(2)
+    sales_growth_rate = slider_left.slider("Future Monthly Sales Growth (%)", -10, 20, 3) / 100.0
+    new_monthly_expense = slider_right.slider("New Monthly Recurring Expense ($)", 0, 10000, 1500)
+
+    # --- FEATURE 1: INTERACTIVE "WHAT-IF" CASH FLOW PROJECTIONS ---
+    st.subheader("Interactive 'What-If' Cash Flow Projections")
+    st.markdown("This chart combines your historical cash flow with an AI-powered forecast. Change the sliders above to see how your decisions could impact your future cash position.")
+
+    # Historical data comes from the cache; only the forecast below depends on the sliders
+    monthly_summary = historical["monthly_summary"]
+
+    # Create forecast
+    last_known_month = monthly_summary.index[-1]
+    last_income = historical["last_income"]
+    last_expense = historical["last_expense"]
+    forecast_dates = pd.date_range(last_known_month + pd.DateOffset(months=1), periods=12, freq='MS', name='Month')
+
+    # Compounded income growth for all 12 months in one vectorized expression
+    months_ahead = np.arange(1, 13)
+    forecasted_income = last_income * (1 + sales_growth_rate) ** months_ahead
+    forecasted_expense = np.full(12, last_expense + new_monthly_expense)
+    forecast_df = pd.DataFrame({
+        'Income': forecasted_income,
+        'Expense': forecasted_expense,
+        'CashFlow': forecasted_income - forecasted_expense,
+    }, index=forecast_dates)
+
+    # Combine historical and forecast data
+    combined_cashflow = pd.concat([monthly_summary['CashFlow'], forecast_df['CashFlow']])
+
+    # Plotting; a WebGL trace keeps the redraw on every slider tick off the SVG DOM. The figure is built once per
+    # session (or per data refresh) and kept in session_state; slider reruns only swap in the new trace data.
+    fig_cashflow = st.session_state.get('cf_fig')
+    if fig_cashflow is None or st.session_state.get('cf_fig_month') != last_known_month:
+        fig_cashflow = go.Figure()
+        fig_cashflow.add_trace(go.Scattergl(
+            mode='lines+markers', name='Cash Flow',
+            line=dict(color='#2E8B57', width=3)
+        ))
+        # Add a vertical line to separate history from forecast
+        fig_cashflow.add_vline(x=last_known_month, line_width=2, line_dash="dash", line_color="gray")
+        fig_cashflow.add_annotation(x=last_known_month, text="Forecast ->", showarrow=True, arrowhead=1)
+
+        fig_cashflow.update_layout(
+            title="Historical vs. Forecasted Monthly Cash Flow",
+            template=transparent_dark(),
+            yaxis_title="Cash Flow (USD)",
+            uirevision='keep' # Keep the user's zoom and pan when the fragment reruns
+        )
+        st.session_state['cf_fig'] = fig_cashflow
+        st.session_state['cf_fig_month'] = last_known_month
+
+    # LTTB bounds the points sent to the browser however many months of history the file holds
+    plotted_cashflow = downsample_lttb(combined_cashflow)
+    fig_cashflow.data[0].update(x=plotted_cashflow.index, y=plotted_cashflow.values)
+    fig_cashflow.layout.annotations[0].y = combined_cashflow.max()
+    st.plotly_chart(fig_cashflow, use_container_width=True)
+
+    # --- FEATURE 4: AUTOMATED FINANCIAL SUMMARY (NLG) ---
+    st.subheader("Automated Financial Summary")
+    st.markdown("This is an AI-generated summary of your financial dashboard, highlighting key insights, risks, and opportunities.")
+
+    # Calculate summary metrics
+    total_income = monthly_summary['Income'].sum()
+    total_expense = monthly_summary['Expense'].sum()
+    net_profit = total_income - total_expense
+    cash_flow_trend = "improving" if monthly_summary['CashFlow'].iloc[-1] > monthly_summary['CashFlow'].iloc[-2] else "declining"
+    top_income_stream = historical["top_income_stream"]
+    anomalies = historical["anomalies"]
+
+    # --- FIX: Rebuilt the summary string using clean concatenation to avoid whitespace issues. ---
+    # --- And escaped the dollar signs with '\'. ---
+    summary_parts = [
+        f"Over the past 24 months, your business has generated **\${total_income:,.2f}** in total income against "
+        f"**\${total_expense:,.2f}** in total expenses, resulting in a net profit of **\${net_profit:,.2f}**. "
+        f"Your primary income driver has been **{top_income_stream}**. ",
+        f"The recent cash flow trend is currently **{cash_flow_trend}**. "
+    ]
+
+    if anomalies:
+        summary_parts.append(
+            f"The AI has detected **{len(anomalies)} potential spending anomaly/anomalies** that require your review, "
+            "primarily in the categories highlighted below. "
+        )
+    else:
+        summary_parts.append(
+            "The AI has not detected any significant spending anomalies in your historical data. "
+        )
+
+    summary_parts.append(
+        f"Based on your 'What-If' scenario of **{sales_growth_rate*100:.1f}% monthly sales growth** and "
+        f"**\${new_monthly_expense:,.2f}** in new expenses, the forecast indicates your cash flow will trend "
+        f"{'upwards' if forecast_df['CashFlow'].iloc[-1] > forecast_df['CashFlow'].iloc[0] else 'downwards'} over the next year."
+    )
 
+    summary_text = "".join(summary_parts)
+    st.info(summary_text)
+
+
+what_if_fragment()
 
 st.divider()
 col1, col2 = st.columns((6, 5))
@@ -110,31 +208,17 @@ with col1:
     st.subheader("AI-Powered Anomaly Detection")
     st.markdown("A visual grid of expenses. The AI automatically flags unusual spending (3 standard deviations above the category average) to help you spot errors or fraud.")
     
-    expenses_df = df[df['Type'] == 'Expense'].copy()
-    expenses_df['Month'] = expenses_df['Date'].dt.strftime('%Y-%m')
-    expense_pivot = expenses_df.pivot_table(index='Category', columns='Month', values='Amount', aggfunc='sum').fillna(0)
-    
-    # AI Simulation: Flag anomalies
-    anomalies = []
-    for category in expense_pivot.index:
-        row = expense_pivot.loc[category]
-        mean = row[row > 0].mean()
-        std = row[row > 0].std()
-        threshold = mean + 3 * std
-        anomalous_months = row[row > threshold]
-        for month, amount in anomalous_months.items():
-            # --- FIX: Escape the '$' with a '\' to ensure it's treated as a literal character. ---
-            anomalies.append(f"High spending of **\${amount:,.2f}** in **{category}** for month **{month}** (Threshold: **\${threshold:,.2f}**)")
+    expense_pivot = historical["expense_pivot"]
+    anomalies = historical["anomalies"]
     
     fig_heatmap = px.imshow(
         expense_pivot,
         labels=dict(x="Month", y="Category", color="Expense Amount"),
         title="Monthly Expenses by Category Heatmap",
         color_continuous_scale="Reds",
-        template="plotly_dark",
+        template=transparent_dark(),
         aspect="auto"
     )
-    fig_heatmap.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
     st.plotly_chart(fig_heatmap, use_container_width=True)
 
     if anomalies:
@@ -147,8 +231,7 @@ with col2:
     st.subheader("Profitability Treemap")
     st.markdown("Visually breaks down your most profitable income streams. The size and color of each rectangle represent its contribution to total revenue.")
     
-    income_df = df[df['Type'] == 'Income']
-    profit_by_cat = income_df.groupby('Category')['Amount'].sum().reset_index()
+    profit_by_cat = historical["profit_by_cat"]
     
     fig_treemap = px.treemap(
         profit_by_cat,
@@ -157,51 +240,9 @@ with col2:
         title='Revenue Contribution by Category',
         color='Amount',
         color_continuous_scale='Greens',
-        template="plotly_dark"
+        template=transparent_dark()
     )
-    fig_treemap.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
     st.plotly_chart(fig_treemap, use_container_width=True)
 
-
-# --- FEATURE 4: AUTOMATED FINANCIAL SUMMARY (NLG) ---
-st.divider()
-st.subheader("Automated Financial Summary")
-st.markdown("This is an AI-generated summary of your financial dashboard, highlighting key insights, risks, and opportunities.")
-
-# Calculate summary metrics
-total_income = monthly_summary['Income'].sum()
-total_expense = monthly_summary['Expense'].sum()
-net_profit = total_income - total_expense
-cash_flow_trend = "improving" if monthly_summary['CashFlow'].iloc[-1] > monthly_summary['CashFlow'].iloc[-2] else "declining"
-top_income_stream = profit_by_cat.sort_values('Amount', ascending=False).iloc[0]['Category']
-
-# --- FIX: Rebuilt the summary string using clean concatenation to avoid whitespace issues. ---
-# --- And escaped the dollar signs with '\'. ---
-summary_parts = [
-    f"Over the past 24 months, your business has generated **\${total_income:,.2f}** in total income against "
-    f"**\${total_expense:,.2f}** in total expenses, resulting in a net profit of **\${net_profit:,.2f}**. "
-    f"Your primary income driver has been **{top_income_stream}**. ",
-    f"The recent cash flow trend is currently **{cash_flow_trend}**. "
-]
-
-if anomalies:
-    summary_parts.append(
-        f"The AI has detected **{len(anomalies)} potential spending anomaly/anomalies** that require your review, "
-        "primarily in the categories highlighted above. "
-    )
-else:
-    summary_parts.append(
-        "The AI has not detected any significant spending anomalies in your historical data. "
-    )
-
-summary_parts.append(
-    f"Based on your 'What-If' scenario of **{sales_growth_rate*100:.1f}% monthly sales growth** and "
-    f"**\${new_monthly_expense:,.2f}** in new expenses, the forecast indicates your cash flow will trend "
-    f"{'upwards' if forecast_df['CashFlow'].iloc[-1] > forecast_df['CashFlow'].iloc[0] else 'downwards'} over the next year."
-)
-
-summary_text = "".join(summary_parts)
-st.info(summary_text)
-
 st.sidebar.markdown("---")
 st.sidebar.info("This is a demo dashboard built by Home Marketing & Consulting.")
@@ -1,9 +1,12 @@
 # pages/4_🎯_Ad_Performance_Command_Center.py
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 
+from core.common import load_css, transparent_dark
+
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
     page_title="Ad Performance Command Center",
@@ -11,33 +14,90 @@ st.set_page_config(
     layout="wide",
 )
 
-# --- FUNCTION TO LOAD CUSTOM CSS ---
-def load_css(file_name):
-    """A function to load a CSS file from the root directory."""
-    with open(file_name) as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
 # Load the custom CSS from the root directory
 load_css("style.css")
 
 
 # --- DATA LOADING AND PREPARATION ---
+def safe_ratio(numerator, denominator):
+    """Element-wise numerator / denominator that yields 0 wherever the denominator is 0, so no inf/NaN cleanup is needed."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator != 0)
+
+# Only the columns the page uses, read straight into compact dtypes (Campaign is never shown).
+# Spend and Revenue stay float64: float32 sums of them drift by cents at platform totals.
+AD_COLUMNS = ['Date', 'Platform', 'CreativeName', 'CreativeType', 'Spend', 'Revenue', 'Impressions', 'Clicks', 'Conversions']
+AD_DTYPES = {
+    'Impressions': 'int32', 'Clicks': 'int32', 'Conversions': 'int32',
+    'Platform': 'category', 'CreativeName': 'category', 'CreativeType': 'category',
+}
+
 @st.cache_data
 def load_data(file_path):
     """Load and preprocess the ad performance data."""
-    data = pd.read_csv(file_path)
-    data['Date'] = pd.to_datetime(data['Date'])
+    data = pd.read_csv(file_path, usecols=AD_COLUMNS, dtype=AD_DTYPES, parse_dates=['Date'])
     # --- Feature Engineering for KPIs ---
-    data['ROAS'] = data['Revenue'] / data['Spend']
-    data['CTR'] = data['Clicks'] / data['Impressions']
-    data['CPC'] = data['Spend'] / data['Clicks']
-    data['ConversionRate'] = data['Conversions'] / data['Clicks']
-    data.fillna(0, inplace=True) # Replace infinities or NaNs with 0
-    data.replace([float('inf'), -float('inf')], 0, inplace=True)
-    return data
+    # Each input column is converted to a float array once and shared by every ratio that divides by it
+    spend, revenue, impressions, clicks, conversions = (
+        data[col].to_numpy(dtype=np.float64) for col in ['Spend', 'Revenue', 'Impressions', 'Clicks', 'Conversions']
+    )
+    data['ROAS'] = safe_ratio(revenue, spend)
+    data['CTR'] = safe_ratio(clicks, impressions)
+    data['CPC'] = safe_ratio(spend, clicks)
+    data['ConversionRate'] = safe_ratio(conversions, clicks)
+    # Platform as a categorical (levels in order of first appearance) with rows stored contiguously per platform
+    data['Platform'] = data['Platform'].cat.reorder_categories(data['Platform'].unique().tolist())
+    return data.sort_values('Platform', kind='stable').reset_index(drop=True)
+
+@st.cache_data
+def compute_creative_perf(file_path):
+    """Per-creative totals and KPIs for every platform in one grouped pass; selections only slice the result."""
+    creative_perf = load_data(file_path).groupby(['Platform', 'CreativeName', 'CreativeType'], observed=True).agg(
+        TotalSpend=('Spend', 'sum'),
+        TotalRevenue=('Revenue', 'sum'),
+        Impressions=('Impressions', 'sum'),
+        Clicks=('Clicks', 'sum'),
+        Conversions=('Conversions', 'sum')
+    )
+    # Recalculate KPIs for the creative level
+    creative_perf['ROAS'] = safe_ratio(creative_perf['TotalRevenue'], creative_perf['TotalSpend'])
+    creative_perf['CTR'] = safe_ratio(creative_perf['Clicks'], creative_perf['Impressions'])
+    creative_perf['ConversionRate'] = safe_ratio(creative_perf['Conversions'], creative_perf['Clicks'])
+    return creative_perf
+
+@st.cache_data
+def compute_platform_kpis(file_path):
+    """Platform totals, KPIs and their min-max scores; only the weighted grade is left for the sliders."""
+    # Group by platform (ad source) to get summary stats
+    platform_summary = load_data(file_path).groupby('Platform', observed=True, sort=False).agg(
+        TotalSpend=('Spend', 'sum'),
+        TotalRevenue=('Revenue', 'sum'),
+        TotalImpressions=('Impressions', 'sum'),
+        TotalClicks=('Clicks', 'sum'),
+        TotalConversions=('Conversions', 'sum')
+    ).reset_index()
+
+    # Calculate aggregate KPIs
+    platform_summary['AvgROAS'] = safe_ratio(platform_summary['TotalRevenue'], platform_summary['TotalSpend'])
+    platform_summary['AvgCTR'] = safe_ratio(platform_summary['TotalClicks'], platform_summary['TotalImpressions'])
+    platform_summary['AvgCPC'] = safe_ratio(platform_summary['TotalSpend'], platform_summary['TotalClicks'])
+    platform_summary['AvgConvRate'] = safe_ratio(platform_summary['TotalConversions'], platform_summary['TotalClicks'])
+
+    # Min-Max Scaling for each KPI (0 to 1), all four columns at once
+    kpis = ['AvgROAS', 'AvgCTR', 'AvgConvRate', 'AvgCPC']
+    sub = platform_summary[kpis]
+    kpi_range = (sub.max() - sub.min()).replace(0, np.nan)
+    norm = ((sub - sub.min()) / kpi_range).fillna(0.5) # Neutral score when every platform has the same value
+    norm['AvgCPC'] = 1 - norm['AvgCPC'] # Lower is better for CPC
+    norm_matrix = norm.to_numpy()
+    platform_summary[[f'{kpi}_norm' for kpi in kpis]] = norm_matrix
+    return platform_summary, norm_matrix
 
 try:
-    df = load_data("data/ad_performance_data.csv")
+    data_path = "data/ad_performance_data.csv"
+    df = load_data(data_path)
+    platform_summary, norm_matrix = compute_platform_kpis(data_path)
 except FileNotFoundError:
     st.error("Data file not found. Please run 'generate_ad_data.py' first.")
     st.stop()
@@ -49,80 +109,54 @@ st.markdown("### A Unified View to Conquer Ad Complexity")
 st.markdown("""
 This dashboard addresses key advertiser pain points by unifying data from all platforms,
 enabling customizable performance analysis, and highlighting creative insights.
-**Use the sliders on the left** to define what 'performance' means to you.
+**Use the weight sliders below** to define what 'performance' means to you.
 """)
 st.divider()
 
-# --- SIDEBAR: CUSTOMIZABLE WEIGHTED RANKING ---
-st.sidebar.header("Performance Grade Tuner")
-st.sidebar.markdown("Set the importance of each KPI to calculate an overall 'Performance Grade' for each ad source.")
-weight_roas = st.sidebar.slider("ROAS Weight", 0, 100, 50)
-weight_ctr = st.sidebar.slider("CTR Weight", 0, 100, 15)
-weight_cpc = st.sidebar.slider("CPC Weight (lower is better)", 0, 100, 20)
-weight_conv_rate = st.sidebar.slider("Conversion Rate Weight", 0, 100, 15)
-
-# Normalize weights to sum to 1
-total_weight = weight_roas + weight_ctr + weight_cpc + weight_conv_rate
-if total_weight == 0: total_weight = 1 # Avoid division by zero
-norm_roas = weight_roas / total_weight
-norm_ctr = weight_ctr / total_weight
-norm_cpc = weight_cpc / total_weight
-norm_conv_rate = weight_conv_rate / total_weight
-
-# --- DATA AGGREGATION & SCORING ---
-# Group by platform (ad source) to get summary stats
-platform_summary = df.groupby('Platform').agg(
-    TotalSpend=('Spend', 'sum'),
-    TotalRevenue=('Revenue', 'sum'),
-    TotalImpressions=('Impressions', 'sum'),
-    TotalClicks=('Clicks', 'sum'),
-    TotalConversions=('Conversions', 'sum')
-).reset_index()
-
-# Calculate aggregate KPIs
-platform_summary['AvgROAS'] = platform_summary['TotalRevenue'] / platform_summary['TotalSpend']
-platform_summary['AvgCTR'] = platform_summary['TotalClicks'] / platform_summary['TotalImpressions']
-platform_summary['AvgCPC'] = platform_summary['TotalSpend'] / platform_summary['TotalClicks']
-platform_summary['AvgConvRate'] = platform_summary['TotalConversions'] / platform_summary['TotalClicks']
-platform_summary.fillna(0, inplace=True)
-
-# Min-Max Scaling for each KPI (0 to 1)
-for kpi in ['AvgROAS', 'AvgCTR', 'AvgConvRate', 'AvgCPC']:
-    min_val = platform_summary[kpi].min()
-    max_val = platform_summary[kpi].max()
-    if (max_val - min_val) == 0:
-        platform_summary[f'{kpi}_norm'] = 0.5 # Assign neutral score if all values are the same
-        continue
-    if kpi == 'AvgCPC': # Lower is better for CPC
-        platform_summary[f'{kpi}_norm'] = 1 - ((platform_summary[kpi] - min_val) / (max_val - min_val))
-    else: # Higher is better for others
-        platform_summary[f'{kpi}_norm'] = (platform_summary[kpi] - min_val) / (max_val - min_val)
-
-# Calculate the final weighted Performance Grade
-platform_summary['PerformanceGrade'] = (
-    platform_summary['AvgROAS_norm'] * norm_roas +
-    platform_summary['AvgCTR_norm'] * norm_ctr +
-    platform_summary['AvgCPC_norm'] * norm_cpc +
-    platform_summary['AvgConvRate_norm'] * norm_conv_rate
-) * 100 # Scale to 100
-
 # --- FEATURE 1: WEIGHTED PERFORMANCE RANKING ---
-st.subheader("Customizable Performance Ranking")
-st.markdown("This table ranks your ad platforms based on the weighted KPI sliders you set. It directly addresses the pain point of defining 'what's working' according to your specific business goals (e.g., maximizing ROAS vs. minimizing cost).")
-
-ranked_platforms = platform_summary[['Platform', 'PerformanceGrade', 'AvgROAS', 'AvgCTR', 'AvgCPC', 'AvgConvRate']].sort_values('PerformanceGrade', ascending=False)
-st.dataframe(
-    ranked_platforms.style
-        .background_gradient(cmap='Greens', subset=['PerformanceGrade'])
-        .format({
-            'PerformanceGrade': '{:.1f}',
-            'AvgROAS': '{:.2f}x',
-            'AvgCTR': '{:.2%}',
-            'AvgCPC': '\${:.2f}',
-            'AvgConvRate': '{:.2%}'
-        }),
-    use_container_width=True
-)
+# Only the grade and the ranking table depend on the weight sliders, so they run as a fragment: moving a slider
+# reruns this block alone. Fragments cannot write to the sidebar, so the sliders sit above the table.
+@st.fragment
+def ranking_fragment():
+    """Draw the KPI weight sliders and the platform ranking they produce."""
+    st.subheader("Customizable Performance Ranking")
+    st.markdown("This table ranks your ad platforms based on the weighted KPI sliders you set. It directly addresses the pain point of defining 'what's working' according to your specific business goals (e.g., maximizing ROAS vs. minimizing cost).")
+
+    st.markdown("**Performance Grade Tuner:** set the importance of each KPI to calculate an overall 'Performance Grade' for each ad source.")
+    roas_col, ctr_col, cpc_col, conv_col = st.columns(4)
+    weight_roas = roas_col.slider("ROAS Weight", 0, 100, 50)
+    weight_ctr = ctr_col.slider("CTR Weight", 0, 100, 15)
+    weight_cpc = cpc_col.slider("CPC Weight (lower is better)", 0, 100, 20)
+    weight_conv_rate = conv_col.slider("Conversion Rate Weight", 0, 100, 15)
+
+    # Normalize weights to sum to 1
+    total_weight = weight_roas + weight_ctr + weight_cpc + weight_conv_rate
+    if total_weight == 0: total_weight = 1 # Avoid division by zero
+    norm_roas = weight_roas / total_weight
+    norm_ctr = weight_ctr / total_weight
+    norm_cpc = weight_cpc / total_weight
+    norm_conv_rate = weight_conv_rate / total_weight
+
+    # Calculate the final weighted Performance Grade as one dot product, scaled to 100
+    kpi_weights = np.array([norm_roas, norm_ctr, norm_conv_rate, norm_cpc])
+    ranked_platforms = platform_summary[['Platform', 'AvgROAS', 'AvgCTR', 'AvgCPC', 'AvgConvRate']].assign(
+        PerformanceGrade=norm_matrix @ kpi_weights * 100
+    )
+    ranked_platforms = ranked_platforms[['Platform', 'PerformanceGrade', 'AvgROAS', 'AvgCTR', 'AvgCPC', 'AvgConvRate']].sort_values('PerformanceGrade', ascending=False)
+    st.dataframe(
+        ranked_platforms.style
+            .background_gradient(cmap='Greens', subset=['PerformanceGrade'])
+            .format({
+                'PerformanceGrade': '{:.1f}',
+                'AvgROAS': '{:.2f}x',
+                'AvgCTR': '{:.2%}',
+                'AvgCPC': '\${:.2f}',
+                'AvgConvRate': '{:.2%}'
+            }),
+        use_container_width=True
+    )
+
+ranking_fragment()
 
 st.divider()
 
@@ -140,10 +174,11 @@ fig_bubble = px.scatter(
     text="Platform",
     size_max=60,
     color_continuous_scale="RdYlGn",
-    template="plotly_dark",
-    title="Spend vs. Revenue by Platform (Bubble Size = Spend)"
+    template=transparent_dark(),
+    title="Spend vs. Revenue by Platform (Bubble Size = Spend)",
+    render_mode='webgl'
 )
-fig_bubble.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
+fig_bubble.update_layout(uirevision='keep')
 st.plotly_chart(fig_bubble, use_container_width=True)
 
 
@@ -154,25 +189,11 @@ st.subheader("Creative Fatigue & Performance Analyzer")
 st.markdown("Addresses the challenge of knowing which creatives are effective. Select a platform and KPI to see which images, videos, or text ads are your top performers, helping you make data-driven decisions on creative strategy.")
 
 # User selection
-selected_platform = st.selectbox("Select a Platform to Analyze Creatives", df['Platform'].unique())
+selected_platform = st.selectbox("Select a Platform to Analyze Creatives", df['Platform'].cat.categories.tolist())
 kpi_to_analyze = st.selectbox("Select KPI to Rank Creatives By", ['ROAS', 'CTR', 'ConversionRate'])
 
-# Filter and group by creative
-creative_perf = df[df['Platform'] == selected_platform].groupby(['CreativeName', 'CreativeType']).agg(
-    TotalSpend=('Spend', 'sum'),
-    TotalRevenue=('Revenue', 'sum'),
-    Impressions=('Impressions', 'sum'),
-    Clicks=('Clicks', 'sum'),
-    Conversions=('Conversions', 'sum')
-).reset_index()
-
-# Recalculate KPIs for the creative level
-creative_perf['ROAS'] = creative_perf['TotalRevenue'] / creative_perf['TotalSpend']
-creative_perf['CTR'] = creative_perf['Clicks'] / creative_perf['Impressions']
-creative_perf['ConversionRate'] = creative_perf['Conversions'] / creative_perf['Clicks']
-creative_perf.fillna(0, inplace=True)
-creative_perf.replace([float('inf'), -float('inf')], 0, inplace=True)
-
+# Creative stats for all platforms are cached; a selection just slices out one platform
+creative_perf = compute_creative_perf(data_path).xs(selected_platform, level='Platform').reset_index()
 
 top_creatives = creative_perf.sort_values(kpi_to_analyze, ascending=False).head(10)
 
@@ -183,10 +204,10 @@ fig_creatives = px.bar(
     y='CreativeName',
     orientation='h',
     color='CreativeType',
-    template="plotly_dark",
+    template=transparent_dark(),
     title=f"Top 10 Performing Creatives on {selected_platform} by {kpi_to_analyze}"
 )
-fig_creatives.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', yaxis={'categoryorder':'total ascending'})
+fig_creatives.update_layout(yaxis={'categoryorder':'total ascending'})
 st.plotly_chart(fig_creatives, use_container_width=True)
 
 